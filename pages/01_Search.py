@@ -9,7 +9,7 @@ IMPORTANT: Uses correct API field names (PascalCase with spaces)
 import streamlit as st
 from utils.api_client import search_fragrances
 from utils.ui_helpers import display_perfume_card, display_perfume_detail
-from utils.recommender import update_user_profile, rank_results
+from utils.recommender import update_user_profile, rank_results, index_perfumes
 
 # ============================================================================
 # IMPORTS AND PAGE CONFIGURATION
@@ -207,6 +207,7 @@ if st.session_state.selected_perfume is not None:
         else:
             if st.button("➕ Add to My Collection", use_container_width=True, type="primary"):
                 st.session_state.user_inventory.append(perfume)
+                index_perfumes([perfume])
                 st.success("Added to your collection!")
                 st.rerun()
 
@@ -307,6 +308,7 @@ else:
                     results = rank_results(results)
                 
                 st.session_state.search_results = results
+                index_perfumes(results)
         else:
             st.warning("Please enter at least 3 characters to search.")
     
@@ -8,7 +8,7 @@ Uses API: GET /fragrances/match with accord matching
 import streamlit as st
 from utils.api_client import match_fragrances
 from utils.ui_helpers import display_perfume_card, display_perfume_detail
-from utils.recommender import update_user_profile, rank_results
+from utils.recommender import update_user_profile, rank_results, index_perfumes
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -169,6 +169,7 @@ if st.session_state.selected_perfume is not None:
         else:
             if st.button("➕ Add to My Collection", use_container_width=True, type="primary"):
                 st.session_state.user_inventory.append(perfume)
+                index_perfumes([perfume])
                 st.success("Added to your collection!")
                 st.rerun()
 
@@ -352,6 +353,7 @@ else:
                 results = rank_results(results)
             
             st.session_state.quiz_results = results
+            index_perfumes(results)
     
     # ========================================================================
     # DISPLAY RESULTS
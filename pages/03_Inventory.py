@@ -13,6 +13,7 @@ import plotly.graph_objects as go
 from collections import Counter
 from utils.api_client import search_fragrances
 from utils.ui_helpers import display_perfume_card, display_perfume_detail, create_note_donut_chart, create_bar_chart
+from utils.recommender import index_perfumes
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -111,36 +112,38 @@ def extract_notes_from_inventory():
     Returns:
         tuple: (top_notes_counter, heart_notes_counter, base_notes_counter)
     """
-    top_notes = []
-    heart_notes = []
-    base_notes = []
+    top_notes = Counter()
+    heart_notes = Counter()
+    base_notes = Counter()
     
+    # One pass over the inventory, counting each tier straight into its Counter
     for perfume in st.session_state.user_inventory:
-        # Get Notes object
         notes_obj = perfume.get("Notes", {})
         
-        # Extract top notes
-        top_notes_list = notes_obj.get("Top", [])
-        for note_obj in top_notes_list:
-            note_name = note_obj.get("name")
-            if note_name:
-                top_notes.append(note_name)
-        
-        # Extract middle/heart notes
-        middle_notes_list = notes_obj.get("Middle", [])
-        for note_obj in middle_notes_list:
-            note_name = note_obj.get("name")
-            if note_name:
-                heart_notes.append(note_name)
-        
-        # Extract base notes
-        base_notes_list = notes_obj.get("Base", [])
-        for note_obj in base_notes_list:
-            note_name = note_obj.get("name")
-            if note_name:
-                base_notes.append(note_name)
+        for tier, counter in (("Top", top_notes), ("Middle", heart_notes), ("Base", base_notes)):
+            counter.update(
+                note_name
+                for note_obj in notes_obj.get(tier, [])
+                if (note_name := note_obj.get("name"))
+            )
+    
+    return top_notes, heart_notes, base_notes
+
+def count_best_ranked(field):
+    """
+    Count the best-ranked entry (first in ranking) of a ranking field.
+    
+    Args:
+        field (str): Ranking field name, e.g. "Season Ranking"
     
-    return Counter(top_notes), Counter(heart_notes), Counter(base_notes)
+    Returns:
+        Counter: Counter object with counts per best-ranked name
+    """
+    return Counter(
+        name
+        for perfume in st.session_state.user_inventory
+        if (ranking := perfume.get(field)) and (name := ranking[0].get("name", ""))
+    )
 
 def extract_seasons_from_inventory():
     """
@@ -150,18 +153,7 @@ def extract_seasons_from_inventory():
     Returns:
         Counter: Counter object with season counts
     """
-    seasons = []
-    
-    for perfume in st.session_state.user_inventory:
-        season_ranking = perfume.get("Season Ranking", [])
-        
-        if season_ranking and len(season_ranking) > 0:
-            # Take the best season (first in ranking)
-            best_season = season_ranking[0].get("name", "")
-            if best_season:
-                seasons.append(best_season)
-    
-    return Counter(seasons)
+    return count_best_ranked("Season Ranking")
 
 def extract_occasions_from_inventory():
     """
@@ -171,18 +163,7 @@ def extract_occasions_from_inventory():
     Returns:
         Counter: Counter object with occasion counts
     """
-    occasions = []
-    
-    for perfume in st.session_state.user_inventory:
-        occasion_ranking = perfume.get("Occasion Ranking", [])
-        
-        if occasion_ranking and len(occasion_ranking) > 0:
-            # Take the best occasion (first in ranking)
-            best_occasion = occasion_ranking[0].get("name", "")
-            if best_occasion:
-                occasions.append(best_occasion)
-    
-    return Counter(occasions)
+    return count_best_ranked("Occasion Ranking")
 
 def search_perfume_to_add(query):
     """Search for perfumes to add to inventory."""
@@ -440,6 +421,7 @@ else:
                         with col3:
                             if st.button("Add", key=f"add_btn_{i}"):
                                 st.session_state.user_inventory.append(perfume)
+                                index_perfumes([perfume])
                                 st.session_state.show_add_perfume = False
                                 st.session_state.add_search_results = []
                                 st.session_state.add_search_query = ""
@@ -8,8 +8,28 @@ IMPORTANT: The API uses PascalCase field names with spaces (e.g., "Image URL", "
 
 import streamlit as st
 import requests
+import orjson
 import time
-from typing import Optional, Dict, List, Any
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from collections import deque, OrderedDict
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, List, Any, Tuple
+
+# Public interface of this module
+__all__ = [
+    "make_request",
+    "get_usage",
+    "search_fragrances",
+    "match_fragrances",
+    "similar_fragrances",
+    "brand_fragrances",
+    "search_notes",
+    "search_accords",
+    "get_transparent_image",
+]
 
 # ============================================================================
 # CONFIGURATION
@@ -24,9 +44,62 @@ REQUEST_TIMEOUT = 10
 # Maximum number of retries for failed requests
 MAX_RETRIES = 3
 
-# Delay between retries (seconds)
+# Base delay between retries (seconds), doubled on every attempt
 RETRY_DELAY = 1
 
+# Upper bound for a single retry wait (seconds)
+MAX_RETRY_DELAY = 30
+
+# Random extra share added to each backoff delay (0.5 = up to +50%)
+RETRY_JITTER = 0.5
+
+# HTTP status codes worth retrying (transient server or rate-limit errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Connection pool sizing for the shared HTTP session
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+
+# Client-side request budget (requests per rolling 60 second window)
+RATE_LIMIT_RPM = 60
+
+# Space out requests once the server reports less than this share of quota left
+LOW_QUOTA_THRESHOLD = 0.1
+
+# Extra delay per request while quota is low (seconds)
+LOW_QUOTA_DELAY = 0.5
+
+# Number of responses whose ETag/Last-Modified we remember for revalidation
+VALIDATOR_CACHE_SIZE = 256
+
+# Headers sent with every request (the API key is added per request)
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json"
+}
+
+# Shared HTTP session, created lazily on first request
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+# Last response body and validators per (endpoint, params) for conditional GETs
+_VALIDATORS: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_VALIDATORS_LOCK = threading.Lock()
+
+# Send timestamps of recent requests for the sliding-window rate limiter
+_REQUEST_WINDOW: deque = deque()
+_RATE_LOCK = threading.Lock()
+
+# Latest quota reported by the server via x-ratelimit-* headers
+_SERVER_QUOTA: Dict[str, Optional[int]] = {"remaining": None, "limit": None}
+
+# ============================================================================
+# EXCEPTIONS
+# ============================================================================
+
+class AuthenticationError(Exception):
+    """Raised when the API rejects the key (401/403)."""
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -34,6 +107,7 @@ RETRY_DELAY = 1
 def get_api_key() -> str:
     """
     Retrieve API key from Streamlit secrets.
+    The key is read per request, so a rotated key takes effect immediately.
     
     Returns:
         str: API key
@@ -55,85 +129,426 @@ def get_headers() -> Dict[str, str]:
         dict: Headers dictionary with API key
     """
     api_key = get_api_key()
-    return {
-        "x-api-key": api_key,
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
+    return {"x-api-key": api_key, **DEFAULT_HEADERS}
 
-def make_request(
+def get_session() -> requests.Session:
+    """
+    Get the shared HTTP session, creating it on first use.
+    
+    Reusing one session keeps connections to the Fragella host alive,
+    so only the first request pays for the TCP/TLS handshake.
+    
+    Returns:
+        requests.Session: Session with connection pool and default headers
+    """
+    global _SESSION
+    
+    if _SESSION is None:
+        # Streamlit runs sessions in separate threads - build the session once
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    max_retries=0
+                ))
+                # The API key is sent per request (see send_request), not stored here
+                session.headers.update(DEFAULT_HEADERS)
+                _SESSION = session
+    
+    return _SESSION
+
+def build_url(endpoint: str) -> str:
+    """
+    Build the full request URL for an endpoint.
+    
+    Args:
+        endpoint (str): API endpoint (e.g., '/fragrances') or absolute URL
+    
+    Returns:
+        str: Absolute URL
+    """
+    return endpoint if endpoint.startswith("http") else BASE_URL + endpoint
+
+def wait_if_throttled(rpm: int = RATE_LIMIT_RPM) -> None:
+    """
+    Block until a request may be sent without exceeding the rate limit.
+    
+    Keeps a sliding 60 second window of send times so we slow down
+    before the API starts answering with 429s. Also adds a short pause
+    while the server reports that little quota is left.
+    
+    Args:
+        rpm (int): Maximum requests per rolling minute
+    """
+    with _RATE_LOCK:
+        now = time.monotonic()
+        
+        # Drop send times that have left the window
+        while _REQUEST_WINDOW and now - _REQUEST_WINDOW[0] >= 60:
+            _REQUEST_WINDOW.popleft()
+        
+        # Reserve the earliest slot: not before earlier reservations, and
+        # (if the window is full) not before the rpm-th latest send expires
+        send_at = max(now, _REQUEST_WINDOW[-1]) if _REQUEST_WINDOW else now
+        if len(_REQUEST_WINDOW) >= rpm:
+            send_at = max(send_at, _REQUEST_WINDOW[-rpm] + 60)
+        
+        _REQUEST_WINDOW.append(send_at)
+        
+        remaining = _SERVER_QUOTA["remaining"]
+        limit = _SERVER_QUOTA["limit"]
+    
+    # Sleep outside the lock so other threads can reserve and record quota
+    delay = send_at - now
+    
+    if remaining is not None and limit and remaining < limit * LOW_QUOTA_THRESHOLD:
+        delay += LOW_QUOTA_DELAY
+    
+    if delay > 0:
+        time.sleep(delay)
+
+def update_server_quota(response: requests.Response) -> None:
+    """
+    Record the remaining quota reported in the response headers.
+    
+    Args:
+        response (requests.Response): Response from the Fragella API
+    """
+    remaining = response.headers.get("x-ratelimit-remaining")
+    limit = response.headers.get("x-ratelimit-limit")
+    
+    with _RATE_LOCK:
+        try:
+            if remaining is not None:
+                _SERVER_QUOTA["remaining"] = int(remaining)
+            if limit is not None:
+                _SERVER_QUOTA["limit"] = int(limit)
+        except ValueError:
+            pass
+
+def get_conditional_headers(key: tuple) -> Tuple[Dict[str, str], Optional[bytes]]:
+    """
+    Build revalidation headers for a request we have answered before.
+    
+    Args:
+        key (tuple): (endpoint, params) of the request
+    
+    Returns:
+        tuple: (If-None-Match/If-Modified-Since headers, previous body or None)
+    """
+    with _VALIDATORS_LOCK:
+        entry = _VALIDATORS.get(key)
+        if entry is None:
+            return {}, None
+        _VALIDATORS.move_to_end(key)
+    
+    headers = {}
+    if entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    
+    return headers, entry["body"]
+
+def store_validators(key: tuple, response: requests.Response) -> None:
+    """
+    Remember a response body with its ETag/Last-Modified for revalidation.
+    
+    Args:
+        key (tuple): (endpoint, params) of the request
+        response (requests.Response): Successful (200) response
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    
+    # Nothing to revalidate against
+    if not etag and not last_modified:
+        return
+    
+    with _VALIDATORS_LOCK:
+        _VALIDATORS[key] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": response.content
+        }
+        _VALIDATORS.move_to_end(key)
+        
+        # Drop the least recently used entries
+        while len(_VALIDATORS) > VALIDATOR_CACHE_SIZE:
+            _VALIDATORS.popitem(last=False)
+
+def get_backoff_delay(attempt: int) -> float:
+    """
+    Compute how long to wait before the next retry.
+    
+    Uses exponential backoff with random jitter so that concurrent
+    Streamlit sessions don't retry in lockstep against the API.
+    
+    Args:
+        attempt (int): Zero-based attempt number that just failed
+    
+    Returns:
+        float: Delay in seconds
+    """
+    delay = min(MAX_RETRY_DELAY, RETRY_DELAY * (2 ** attempt))
+    return delay * (1 + random.uniform(0, RETRY_JITTER))
+
+def get_retry_after(response: requests.Response, default: float) -> float:
+    """
+    Read the server's Retry-After header from a 429 response.
+    
+    The header may be a number of seconds or an HTTP date.
+    
+    Args:
+        response (requests.Response): Rate-limited response
+        default (float): Delay to use if the header is missing or invalid
+    
+    Returns:
+        float: Delay in seconds
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return default
+    
+    # Delay in seconds, e.g. "Retry-After: 5"
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    # HTTP date, e.g. "Retry-After: Wed, 21 Oct 2026 07:28:00 GMT"
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def send_request(
     endpoint: str,
-    params: Optional[Dict[str, Any]] = None,
+    params: Optional[Tuple[Tuple[str, Any], ...]] = None,
     retries: int = MAX_RETRIES
-) -> Optional[Any]:
+) -> Optional[bytes]:
     """
     Make GET request to Fragella API with error handling and retries.
     
     Args:
         endpoint (str): API endpoint (e.g., '/fragrances')
-        params (dict, optional): Query parameters
+        params (tuple, optional): Query parameters as sorted (key, value) pairs
         retries (int): Number of retry attempts
     
     Returns:
-        Response data or None if request fails
+        bytes: Raw JSON response body or None if request fails
     """
-    url = f"{BASE_URL}{endpoint}"
-    headers = get_headers()
+    url = build_url(endpoint)
+    session = get_session()
+    
+    # Read the key on every call so a rotated secret is picked up without a restart
+    api_key = get_api_key()
     
     for attempt in range(retries):
+        is_last_attempt = attempt == retries - 1
+        
         try:
-            # Make GET request
-            response = requests.get(
+            # Respect the client-side rate limit before every attempt
+            wait_if_throttled()
+            
+            # Revalidate instead of re-downloading if we've seen this before
+            conditional_headers, previous_body = get_conditional_headers((endpoint, params))
+            request_headers = {"x-api-key": api_key, **conditional_headers}
+            
+            # Make GET request over the shared session (headers preset)
+            response = session.get(
                 url,
-                headers=headers,
                 params=params,
+                headers=request_headers,
                 timeout=REQUEST_TIMEOUT
             )
+            update_server_quota(response)
             
-            # Check for rate limiting
+            # Not modified - the body we already have is still current
+            if response.status_code == 304 and previous_body is not None:
+                return previous_body
+            
+            # Check for rate limiting - honor the server's Retry-After header
             if response.status_code == 429:
                 st.warning("⚠️ API rate limit reached. Please wait a moment.")
-                time.sleep(RETRY_DELAY * 2)
+                wait = get_retry_after(response, get_backoff_delay(attempt))
+                
+                # Don't freeze the page for longer than we'd ever back off
+                if is_last_attempt or wait > MAX_RETRY_DELAY:
+                    return None
+                time.sleep(wait)
                 continue
             
             # Check for successful response
             if response.status_code == 200:
-                return response.json()
+                store_validators((endpoint, params), response)
+                return response.content
             
             # Check for not found
             elif response.status_code == 404:
                 return None
             
-            # Other error codes
+            # Authentication failures won't fix themselves - fail fast
+            elif response.status_code in (401, 403):
+                st.error("❌ API key was rejected. Please check FRAGELLA_API_KEY in Streamlit secrets.")
+                # Raise rather than return None so the failure isn't cached
+                raise AuthenticationError(response.status_code)
+            
+            # Don't burn quota retrying non-transient errors
+            elif response.status_code not in RETRYABLE_STATUS_CODES:
+                return None
+            
+            # Transient error codes
             else:
-                if attempt < retries - 1:
-                    time.sleep(RETRY_DELAY)
+                if not is_last_attempt:
+                    time.sleep(get_backoff_delay(attempt))
                     continue
                 return None
         
         except requests.exceptions.Timeout:
-            if attempt < retries - 1:
-                time.sleep(RETRY_DELAY)
+            if not is_last_attempt:
+                time.sleep(get_backoff_delay(attempt))
                 continue
             return None
         
         except requests.exceptions.ConnectionError:
-            if attempt < retries - 1:
-                time.sleep(RETRY_DELAY)
+            if not is_last_attempt:
+                time.sleep(get_backoff_delay(attempt))
                 continue
             return None
         
+        except AuthenticationError:
+            raise
+        
         except Exception as e:
             st.error(f"Unexpected error: {str(e)}")
             return None
     
     return None
 
+@st.cache_resource(ttl=3600, max_entries=256, show_spinner=False)  # Cache for 1 hour
+def fetch_response_bytes(
+    endpoint: str,
+    params: Optional[Tuple[Tuple[str, Any], ...]] = None,
+    retries: int = MAX_RETRIES
+) -> Optional[bytes]:
+    """
+    Fetch the raw response body for a request.
+    
+    The raw body is cached rather than the decoded JSON, which keeps
+    the cache small. Bytes are immutable, so they are cached as a shared
+    resource and returned without the pickle round-trip of st.cache_data.
+    Streamlit holds a per-key lock while computing a cache miss, so
+    identical concurrent requests wait for the first one's result.
+    
+    Args:
+        endpoint (str): API endpoint (e.g., '/fragrances')
+        params (tuple, optional): Query parameters as sorted (key, value) pairs
+        retries (int): Number of retry attempts
+    
+    Returns:
+        bytes: Raw JSON response body or None if request fails
+    """
+    return send_request(endpoint, params, retries)
+
+def make_request(
+    endpoint: str,
+    params: Optional[Dict[str, Any]] = None,
+    retries: int = MAX_RETRIES
+) -> Optional[Any]:
+    """
+    Make GET request to Fragella API and decode the JSON response.
+    
+    Args:
+        endpoint (str): API endpoint (e.g., '/fragrances')
+        params (dict, optional): Query parameters
+        retries (int): Number of retry attempts
+    
+    Returns:
+        Response data or None if request fails
+    """
+    # Cache key must be hashable - use sorted (key, value) pairs
+    params_key = tuple(sorted(params.items())) if params else None
+    
+    try:
+        body = fetch_response_bytes(endpoint, params_key, retries)
+    except AuthenticationError:
+        # Already reported; not cached, so a fixed key works on the next rerun
+        return None
+    
+    if body is None:
+        return None
+    
+    try:
+        return orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        st.error(f"Unexpected error: {str(e)}")
+        return None
+
+def _unwrap(result: Any, key: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Extract the list of items from an API response.
+    
+    The API normally returns an array directly, but wrapped responses
+    like {"fragrances": [...]} or {"data": [...]} are accepted too.
+    
+    Args:
+        result: Decoded API response
+        key (str): Wrapper key to look for (e.g., 'fragrances', 'notes')
+        limit (int, optional): Maximum number of items to return
+    
+    Returns:
+        list: Items from the response (empty if none)
+    """
+    if isinstance(result, list):
+        items = result
+    elif isinstance(result, dict):
+        items = result.get(key) or result.get("data") or []
+    else:
+        return []
+    
+    return items[:limit] if limit else items
+
+def _normalize_perfume(perfume: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Lowercase a perfume's accord names once, when it comes off the wire.
+    
+    "Main Accords" and the keys of "Main Accords Percentage" are rewritten
+    to lowercased, stripped names, so downstream code (the recommender,
+    accord colors) can use them as-is.
+    
+    Args:
+        perfume (dict): Perfume data from API
+    
+    Returns:
+        dict: The same perfume with normalized accord names
+    """
+    if not isinstance(perfume, dict):
+        return perfume
+    
+    main_accords = perfume.get("Main Accords")
+    if main_accords:
+        perfume["Main Accords"] = [accord.lower().strip() for accord in main_accords if accord]
+    
+    main_accords_percentage = perfume.get("Main Accords Percentage")
+    if main_accords_percentage:
+        perfume["Main Accords Percentage"] = {
+            accord.lower().strip(): strength for accord, strength in main_accords_percentage.items()
+        }
+    
+    return perfume
+
 # ============================================================================
 # API ENDPOINT FUNCTIONS
 # ============================================================================
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def get_usage() -> Optional[Dict[str, Any]]:
     """
     Get API usage statistics.
@@ -158,7 +573,6 @@ def get_usage() -> Optional[Dict[str, Any]]:
     """
     return make_request("/usage")
 
-@st.cache_data(ttl=3600)
 def search_fragrances(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Search for fragrances by name, brand, or keyword.
@@ -190,7 +604,10 @@ def search_fragrances(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     Returns:
         list: List of perfume dictionaries with API field names
     """
-    if not query or len(query) < 3:
+    # Normalize so "Chanel" and "chanel " share a cache entry
+    query = (query or "").lower().strip()
+    
+    if len(query) < 3:
         return []
     
     params = {
@@ -200,13 +617,8 @@ def search_fragrances(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     
     result = make_request("/fragrances", params=params)
     
-    # The API returns an array directly
-    if isinstance(result, list):
-        return result
-    
-    return []
+    return [_normalize_perfume(p) for p in _unwrap(result, "fragrances", params["limit"])]
 
-@st.cache_data(ttl=3600)
 def match_fragrances(accords: str = None, top: str = None, middle: str = None, 
                     base: str = None, general: str = None, limit: int = 10) -> List[Dict[str, Any]]:
     """
@@ -245,12 +657,8 @@ def match_fragrances(accords: str = None, top: str = None, middle: str = None,
     
     result = make_request("/fragrances/match", params=params)
     
-    if isinstance(result, list):
-        return result
-    
-    return []
+    return [_normalize_perfume(p) for p in _unwrap(result, "fragrances", params["limit"])]
 
-@st.cache_data(ttl=3600)
 def similar_fragrances(name: str, limit: int = 10) -> Optional[Dict[str, Any]]:
     """
     Find fragrances similar to a given perfume name.
@@ -283,7 +691,6 @@ def similar_fragrances(name: str, limit: int = 10) -> Optional[Dict[str, Any]]:
     
     return result
 
-@st.cache_data(ttl=3600)
 def brand_fragrances(brand_name: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get all fragrances from a specific brand.
@@ -297,6 +704,9 @@ def brand_fragrances(brand_name: str, limit: int = 10) -> List[Dict[str, Any]]:
     Returns:
         list: List of perfumes from the brand
     """
+    # Brand lookup is case-insensitive - normalize for a shared cache entry
+    brand_name = (brand_name or "").lower().strip()
+    
     if not brand_name:
         return []
     
@@ -307,12 +717,8 @@ def brand_fragrances(brand_name: str, limit: int = 10) -> List[Dict[str, Any]]:
     
     result = make_request(f"/brands/{encoded_brand}", params=params)
     
-    if isinstance(result, list):
-        return result
-    
-    return []
+    return [_normalize_perfume(p) for p in _unwrap(result, "fragrances", params["limit"])]
 
-@st.cache_data(ttl=3600)
 def search_notes(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Search for perfume notes.
@@ -332,7 +738,10 @@ def search_notes(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     Returns:
         list: List of note dictionaries
     """
-    if not query or len(query) < 2:
+    # Normalize so differently-cased queries share a cache entry
+    query = (query or "").lower().strip()
+    
+    if len(query) < 2:
         return []
     
     params = {
@@ -342,12 +751,8 @@ def search_notes(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     
     result = make_request("/notes", params=params)
     
-    if isinstance(result, list):
-        return result
-    
-    return []
+    return _unwrap(result, "notes", params["limit"])
 
-@st.cache_data(ttl=3600)
 def search_accords(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Search for perfume accords.
@@ -366,7 +771,10 @@ def search_accords(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     Returns:
         list: List of accord dictionaries
     """
-    if not query or len(query) < 2:
+    # Normalize so differently-cased queries share a cache entry
+    query = (query or "").lower().strip()
+    
+    if len(query) < 2:
         return []
     
     params = {
@@ -376,10 +784,7 @@ def search_accords(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     
     result = make_request("/accords", params=params)
     
-    if isinstance(result, list):
-        return result
-    
-    return []
+    return _unwrap(result, "accords", params["limit"])
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -401,9 +806,6 @@ def get_transparent_image(image_url: str) -> str:
     if not image_url:
         return ""
     
-    # Replace .jpg with .webp for transparent background
-    if image_url.endswith(".jpg"):
-        return image_url.replace(".jpg", ".webp")
-    
-    return image_url
+    # Swap a trailing .jpg for .webp (only the extension, not other ".jpg" text)
+    return image_url[:-4] + ".webp" if image_url.endswith(".jpg") else image_url
 
@@ -9,8 +9,8 @@ IMPORTANT: Works with correct API field names:
 
 import streamlit as st
 import numpy as np
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+import functools
+from typing import List, Dict, Any, Optional, Tuple
 
 # ============================================================================
 # ACCORD STRENGTH WEIGHTS
@@ -38,6 +38,9 @@ def perfume_to_vector(perfume: Dict[str, Any]) -> Dict[str, float]:
     - "Main Accords": array of strings (ordered list)
     - "Main Accords Percentage": object {accord_name: "Dominant"/"Prominent"/etc.}
     
+    Vectors are memoized by accord content, so a perfume seen again on a
+    later rerun is not re-vectorized. The returned dict is shared - don't mutate it.
+    
     Args:
         perfume (dict): Perfume data from API
     
@@ -45,28 +48,73 @@ def perfume_to_vector(perfume: Dict[str, Any]) -> Dict[str, float]:
         dict: Accord name -> weight mapping
         Example: {"sweet": 1.0, "floral": 0.8, "fruity": 0.6}
     """
-    vector = {}
+    vector, _ = perfume_to_vector_with_norm(perfume)
+    return vector
+
+def perfume_to_vector_with_norm(perfume: Dict[str, Any]) -> Tuple[Dict[str, float], float]:
+    """
+    Convert a perfume to its accord vector and the vector's magnitude.
+    
+    Both are memoized together, so ranking never recomputes norms of
+    perfumes it has already seen.
     
+    Args:
+        perfume (dict): Perfume data from API
+    
+    Returns:
+        tuple: (accord name -> weight mapping, Euclidean norm)
+    """
     # Get Main Accords array and Main Accords Percentage object
     main_accords = perfume.get("Main Accords", [])
     main_accords_percentage = perfume.get("Main Accords Percentage", {})
     
     if not main_accords:
-        return vector
+        return {}, 0.0
     
-    for accord in main_accords:
-        # Normalize accord name (lowercase)
-        accord_normalized = accord.lower().strip()
-        
-        # Get strength descriptor from Main Accords Percentage
-        strength = main_accords_percentage.get(accord, "Moderate")
-        
+    # Freeze the inputs into a hashable cache key
+    strengths = tuple(main_accords_percentage.get(accord, "Moderate") for accord in main_accords)
+    
+    return _vector_for(tuple(main_accords), strengths)
+
+@functools.lru_cache(maxsize=4096)
+def _vector_for(main_accords: tuple, strengths: tuple) -> Tuple[Dict[str, float], float]:
+    """
+    Build the accord vector for frozen accord names and strength descriptors.
+    
+    Args:
+        main_accords (tuple): Accord names in order of prominence
+        strengths (tuple): Strength descriptor for each accord
+    
+    Returns:
+        tuple: (accord name -> weight mapping, Euclidean norm)
+    """
+    vector = {}
+    
+    # Accord names arrive lowercased from the API client
+    for accord, strength in zip(main_accords, strengths):
         # Map strength to numeric weight
         weight = ACCORD_WEIGHTS.get(strength, 0.5)  # Default 0.5 if unknown
         
-        vector[accord_normalized] = weight
+        vector[accord] = weight
     
-    return vector
+    norm = float(np.sqrt(sum(weight * weight for weight in vector.values())))
+    
+    return vector, norm
+
+def index_perfumes(perfumes: List[Dict[str, Any]]) -> None:
+    """
+    Add perfumes to the session's name -> perfume index.
+    
+    Called wherever search, quiz or inventory data lands in session state,
+    so build_user_profile can look clicked perfumes up by name.
+    
+    Args:
+        perfumes (list): Perfume dictionaries from the API
+    """
+    # API field name is "Name" (PascalCase)
+    st.session_state.setdefault("perfume_by_name", {}).update(
+        (perfume["Name"], perfume) for perfume in perfumes if perfume.get("Name")
+    )
 
 def build_user_profile(clicked_perfumes: Dict[str, int]) -> Dict[str, float]:
     """
@@ -81,54 +129,49 @@ def build_user_profile(clicked_perfumes: Dict[str, int]) -> Dict[str, float]:
     Returns:
         dict: User profile as accord name -> weight mapping
     """
-    # Accumulate accord weights across all clicked perfumes
-    accord_accumulator = defaultdict(float)
     total_clicks = sum(clicked_perfumes.values())
     
     if total_clicks == 0:
         return {}
     
-    # Get clicked perfume data from session state
-    all_perfumes = []
-    
-    # Collect from search results
-    if "search_results" in st.session_state:
-        all_perfumes.extend(st.session_state.search_results)
+    # Look up clicked perfume data in the session's name index
+    perfume_index = st.session_state.get("perfume_by_name", {})
     
-    # Collect from quiz results
-    if "quiz_results" in st.session_state:
-        all_perfumes.extend(st.session_state.quiz_results)
+    # Collect vectors and click counts of clicked perfumes
+    clicked_vectors = []
+    click_counts = []
     
-    # Collect from inventory
-    if "user_inventory" in st.session_state:
-        all_perfumes.extend(st.session_state.user_inventory)
-    
-    # Build profile from clicked perfumes
-    for perfume in all_perfumes:
-        # API field name is "Name" (PascalCase)
-        perfume_name = perfume.get("Name", "")
+    for perfume_name, click_count in clicked_perfumes.items():
+        perfume = perfume_index.get(perfume_name)
         
-        if perfume_name not in clicked_perfumes:
+        if perfume is None:
             continue
         
-        # Get click count for this perfume
-        click_count = clicked_perfumes[perfume_name]
-        
-        # Convert perfume to vector
-        perfume_vector = perfume_to_vector(perfume)
-        
-        # Add weighted accords to accumulator
-        for accord, weight in perfume_vector.items():
-            # Weight by click frequency
-            accord_accumulator[accord] += weight * click_count
-    
-    # Normalize by total clicks to get average
-    user_profile = {
-        accord: weight / total_clicks
-        for accord, weight in accord_accumulator.items()
-    }
+        clicked_vectors.append(perfume_to_vector(perfume))
+        click_counts.append(click_count)
+    
+    accord_index = build_accord_index(clicked_vectors)
+    
+    # Fold the click-frequency average into each contribution up front
+    inv_total = 1.0 / total_clicks
     
-    return user_profile
+    # Flatten every (accord, weight * click share) contribution into two arrays
+    indices = np.fromiter(
+        (accord_index[accord] for vector in clicked_vectors for accord in vector),
+        dtype=np.intp
+    )
+    contributions = np.fromiter(
+        (weight * (click_count * inv_total)
+         for vector, click_count in zip(clicked_vectors, click_counts)
+         for weight in vector.values()),
+        dtype=np.float32
+    )
+    
+    # Accumulate all contributions in one unbuffered scatter-add
+    profile = np.zeros(len(accord_index), dtype=np.float32)
+    np.add.at(profile, indices, contributions)
+    
+    return {accord: float(profile[i]) for accord, i in accord_index.items()}
 
 def cosine_similarity(vector1: Dict[str, float], vector2: Dict[str, float]) -> float:
     """
@@ -171,10 +214,107 @@ def cosine_similarity(vector1: Dict[str, float], vector2: Dict[str, float]) -> f
     
     return float(similarity)
 
+def build_accord_index(vectors: List[Dict[str, float]]) -> Dict[str, int]:
+    """
+    Assign a column index to every accord appearing in the given vectors.
+    
+    Args:
+        vectors (list): Accord vectors (accord name -> weight)
+    
+    Returns:
+        dict: Accord name -> column index
+    """
+    all_accords = set()
+    for vector in vectors:
+        all_accords.update(vector)
+    
+    return {accord: i for i, accord in enumerate(sorted(all_accords))}
+
+def vectors_to_matrix(vectors: List[Dict[str, float]], accord_index: Dict[str, int]) -> np.ndarray:
+    """
+    Stack accord vectors into a dense matrix (one row per vector).
+    
+    Args:
+        vectors (list): Accord vectors (accord name -> weight)
+        accord_index (dict): Accord name -> column index
+    
+    Returns:
+        np.ndarray: float32 matrix of shape (len(vectors), len(accord_index))
+    """
+    matrix = np.zeros((len(vectors), len(accord_index)), dtype=np.float32)
+    
+    for row, vector in enumerate(vectors):
+        for accord, weight in vector.items():
+            matrix[row, accord_index[accord]] = weight
+    
+    return matrix
+
+def cosine_similarities(
+    matrix: np.ndarray,
+    vector: np.ndarray,
+    row_norms: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Calculate cosine similarity between every row of a matrix and a vector.
+    
+    Vectorized version of cosine_similarity: one matrix-vector product
+    instead of a Python loop over perfumes.
+    
+    Args:
+        matrix (np.ndarray): Row vectors, shape (n, accords)
+        vector (np.ndarray): Vector to compare against, shape (accords,)
+        row_norms (np.ndarray, optional): Precomputed norms of the rows
+    
+    Returns:
+        np.ndarray: Similarity per row (0.0 where either vector is zero)
+    """
+    if row_norms is None:
+        row_norms = np.linalg.norm(matrix, axis=1)
+    
+    dot_products = matrix @ vector
+    magnitudes = row_norms * np.linalg.norm(vector)
+    
+    # Avoid division by zero
+    return np.divide(
+        dot_products,
+        magnitudes,
+        out=np.zeros_like(dot_products),
+        where=magnitudes != 0
+    )
+
 # ============================================================================
 # RECOMMENDATION FUNCTIONS
 # ============================================================================
 
+def top_k_indices(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    Get the indices of the highest scores, best first.
+    
+    With k set, only the top k are selected (np.argpartition) and sorted,
+    which avoids sorting the whole array when only a few entries are shown.
+    
+    Args:
+        scores (np.ndarray): Score per item
+        k (int, optional): Number of indices to return (None = all)
+    
+    Returns:
+        np.ndarray: Indices ordered by descending score (ties keep original order)
+    """
+    if k is None or k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    # Find the k-th best score, then keep every index that reaches it so
+    # entries tied at the boundary are all candidates
+    kth_score = -np.partition(-scores, k - 1)[k - 1]
+    candidates = np.flatnonzero(scores >= kth_score)
+    
+    # Sort candidates by score, breaking ties by original position
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
+
 def update_user_profile(perfume: Dict[str, Any]) -> None:
     """
     Update the user profile in session state based on a clicked perfume.
@@ -193,7 +333,7 @@ def update_user_profile(perfume: Dict[str, Any]) -> None:
     # Store in session state
     st.session_state.user_profile = user_profile
 
-def rank_results(perfumes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def rank_results(perfumes: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Rank perfume results based on user profile similarity.
     
@@ -202,6 +342,7 @@ def rank_results(perfumes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     
     Args:
         perfumes (list): List of perfume dictionaries to rank
+        top_k (int, optional): Only return the k best matches (None = all)
     
     Returns:
         list: Sorted list of perfumes (highest similarity first)
@@ -213,44 +354,56 @@ def rank_results(perfumes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not user_profile:
         return perfumes
     
-    # Calculate similarity scores for each perfume
-    scored_perfumes = []
+    if not perfumes:
+        return perfumes
     
-    for perfume in perfumes:
-        # Convert perfume to vector
-        perfume_vector = perfume_to_vector(perfume)
-        
-        # Calculate similarity to user profile
-        similarity = cosine_similarity(user_profile, perfume_vector)
-        
+    # Convert perfumes to vectors (with cached norms) over one shared accord index
+    perfume_vectors, perfume_norms = zip(*(perfume_to_vector_with_norm(p) for p in perfumes))
+    accord_index = build_accord_index([user_profile, *perfume_vectors])
+    
+    perfume_matrix = vectors_to_matrix(perfume_vectors, accord_index)
+    user_vector = vectors_to_matrix([user_profile], accord_index)[0]
+    row_norms = np.array(perfume_norms, dtype=np.float32)
+    
+    # Calculate similarity to user profile for all perfumes at once
+    similarities = cosine_similarities(perfume_matrix, user_vector, row_norms)
+    
+    # Sort by similarity score (descending, ties keep their original order)
+    order = top_k_indices(similarities, top_k)
+    
+    ranked_perfumes = []
+    
+    for i in order:
         # Add similarity score to perfume data
-        perfume_copy = perfume.copy()
-        perfume_copy["_similarity_score"] = similarity
+        perfume_copy = perfumes[i].copy()
+        perfume_copy["_similarity_score"] = float(similarities[i])
         
-        scored_perfumes.append(perfume_copy)
-    
-    # Sort by similarity score (descending)
-    ranked_perfumes = sorted(
-        scored_perfumes,
-        key=lambda p: p.get("_similarity_score", 0.0),
-        reverse=True
-    )
+        ranked_perfumes.append(perfume_copy)
     
     return ranked_perfumes
 
-def get_user_accord_preferences() -> Dict[str, float]:
+def get_user_accord_preferences(top_n: Optional[int] = None) -> Dict[str, float]:
     """
     Get the user's accord preferences from their profile.
     
+    Args:
+        top_n (int, optional): Only return the n strongest accords (None = all)
+    
     Returns:
         dict: Accord name -> preference weight, sorted by weight
     """
     user_profile = st.session_state.get("user_profile", {})
     
+    if not user_profile:
+        return {}
+    
+    accords = list(user_profile)
+    weights = np.fromiter(user_profile.values(), dtype=np.float64, count=len(accords))
+    
     # Sort by weight (descending)
-    sorted_accords = dict(
-        sorted(user_profile.items(), key=lambda x: x[1], reverse=True)
-    )
+    sorted_accords = {
+        accords[i]: user_profile[accords[i]] for i in top_k_indices(weights, top_n)
+    }
     
     return sorted_accords
 
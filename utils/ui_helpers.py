@@ -9,10 +9,15 @@ This module handles the display of perfume data with proper field access.
 """
 
 import streamlit as st
+import functools
+import html
+import numpy as np
+from dataclasses import dataclass
 import plotly.graph_objects as go
 import plotly.express as px
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from collections import Counter
+from utils.api_client import get_transparent_image
 
 # ============================================================================
 # COLOR SCHEMES
@@ -50,10 +55,90 @@ ACCORD_COLORS = {
 # Default color for unknown accords
 DEFAULT_ACCORD_COLOR = "#C8A2C8"
 
+# Slice colors for note donut charts (resolved once at import)
+NOTE_CHART_COLORS = tuple(px.colors.sequential.RdPu)
+
+# Progress bar value (0-100) for each accord strength descriptor
+ACCORD_STRENGTH_VALUES = {
+    "Dominant": 100,
+    "Prominent": 80,
+    "Moderate": 60,
+    "Subtle": 40,
+    "Trace": 20
+}
+
+# Shown when a perfume has no usable image
+PLACEHOLDER_IMAGE_URL = "https://via.placeholder.com/300x400.png?text=No+Image"
+
+# Styles for the accord strength bars in the detail view
+ACCORD_BARS_CSS = """
+<style>
+    .accord-row {
+        display: grid;
+        grid-template-columns: 1fr 3fr;
+        align-items: center;
+        gap: 1rem;
+        margin-bottom: 0.6rem;
+    }
+    .accord-name {
+        font-weight: 700;
+    }
+    .accord-strength {
+        font-size: 0.85rem;
+        margin-bottom: 0.2rem;
+    }
+    .accord-track {
+        background: rgba(200, 200, 200, 0.3);
+        border-radius: 4px;
+        height: 8px;
+    }
+    .accord-bar {
+        border-radius: 4px;
+        height: 8px;
+        /* Outline keeps pale accord colors (white floral, musk) visible on the track */
+        box-shadow: inset 0 0 0 1px rgba(0, 0, 0, 0.2);
+    }
+</style>
+"""
+
+# ============================================================================
+# CHART STYLING
+# ============================================================================
+
+# Shared chart styling, built once and passed straight to update_layout
+# (layout values override Streamlit's chart theme; template values would not).
+# Plotly copies these dicts, never mutates them.
+CHART_TITLE_FONT = dict(size=16, color="#d4567b", family="Arial")
+CHART_LAYOUT = dict(
+    showlegend=False,
+    height=350,
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)'
+)
+CHART_GRID_AXIS = dict(gridcolor='rgba(200,200,200,0.3)', showgrid=True)
+DONUT_CHART_MARGIN = dict(t=50, b=20, l=20, r=20)
+BAR_CHART_MARGIN = dict(t=50, b=50, l=50, r=20)
+BAR_OUTLINE = dict(color='white', width=1.5)
+PIE_OUTLINE = dict(color='white', width=2)
+EMPTY_CHART_FONT = dict(size=14, color="#999")
+
 # ============================================================================
 # IMAGE UTILITIES
 # ============================================================================
 
+def is_valid_image_url(image_url: str) -> bool:
+    """
+    Check whether an image URL is something st.image can display.
+    
+    Args:
+        image_url (str): Image URL from API
+    
+    Returns:
+        bool: True for non-empty http(s) URLs
+    """
+    return isinstance(image_url, str) and image_url.startswith(("http://", "https://"))
+
+@functools.lru_cache(maxsize=1024)
 def get_transparent_image_url(image_url: str) -> str:
     """
     Convert image URL to transparent background version.
@@ -63,24 +148,23 @@ def get_transparent_image_url(image_url: str) -> str:
         image_url (str): Original image URL from API
     
     Returns:
-        str: Transparent version URL or original
+        str: Transparent version URL, original, or placeholder if invalid
     """
-    if not image_url:
-        return "https://via.placeholder.com/300x400.png?text=No+Image"
+    if not is_valid_image_url(image_url):
+        return PLACEHOLDER_IMAGE_URL
     
     # Replace .jpg with .webp for transparent background
-    if image_url.endswith(".jpg"):
-        return image_url.replace(".jpg", ".webp")
-    
-    return image_url
+    return get_transparent_image(image_url)
 
 # ============================================================================
 # ACCORD UTILITIES
 # ============================================================================
 
+@functools.lru_cache(maxsize=256)
 def get_accord_color(accord_name: str) -> str:
     """
     Get color for an accord name.
+    Results are memoized, so repeated accords cost a single cache lookup.
     
     Args:
         accord_name (str): Name of the accord
@@ -108,10 +192,158 @@ def format_accords(accords_list: List[str], max_count: int = 5) -> str:
     
     return ", ".join(accords_list[:max_count])
 
+@functools.lru_cache(maxsize=8192)
+def format_price(price: str, detail: bool = False) -> str:
+    """
+    Format a price line for a perfume card or detail view.
+    
+    Args:
+        price (str): Price from API
+        detail (bool): Use the labeled detail-view format
+    
+    Returns:
+        str: Markdown price line
+    """
+    if detail:
+        return f"**💰 Price:** ${price}"
+    
+    return f"💰 ${price}"
+
+# ============================================================================
+# PERFUME VIEW MODEL
+# ============================================================================
+
+@dataclass(frozen=True)
+class PerfumeView:
+    """
+    Display-ready fields of one perfume, resolved once from the raw API dict.
+    
+    Attributes:
+        key_notes: Up to 8 general notes, comma-separated ("" if none)
+        accords: Accord names in order of prominence
+        accord_summary: First 3 accords, comma-separated (for cards)
+        accord_strengths: (accord, strength descriptor, bar value 0-100) for the top 10 accords
+        top_notes / middle_notes / base_notes: Up to 6 note names per tier
+        seasons_text / occasions_text: Ranked bullet lines ("Name (score)"), "" if none
+    """
+    name: str
+    brand: str
+    image_url: str
+    price: str
+    gender: str
+    longevity: str
+    sillage: str
+    oil_type: str
+    key_notes: str
+    top_notes: Tuple[str, ...]
+    middle_notes: Tuple[str, ...]
+    base_notes: Tuple[str, ...]
+    accords: Tuple[str, ...]
+    accord_summary: str
+    accord_strengths: Tuple[Tuple[str, str, int], ...]
+    seasons_text: str
+    occasions_text: str
+
+def format_ranking(ranking: List[Dict[str, Any]]) -> str:
+    """
+    Format a season/occasion ranking as markdown bullet lines.
+    
+    Args:
+        ranking (list): {name, score} objects, ordered best to worst
+    
+    Returns:
+        str: One "• Name (score)" line per entry ("" if none)
+    """
+    return "  \n".join(
+        f"• {entry.get('name', '').capitalize()} ({entry.get('score', 0):.2f})"
+        for entry in ranking or ()
+    )
+
+def build_perfume_view(perfume: Dict[str, Any]) -> PerfumeView:
+    """
+    Resolve every field the card and detail views need from a perfume dict.
+    
+    Args:
+        perfume (dict): Perfume data from API
+    
+    Returns:
+        PerfumeView: Display-ready perfume fields
+    """
+    # Notes - API returns object with "Top", "Middle", "Base" keys,
+    # each an array of {"name", "imageUrl"} objects; keep the first 6 names
+    notes_obj = perfume.get("Notes") or {}
+    top_notes, middle_notes, base_notes = (
+        tuple(note_obj.get("name", "Unknown") for note_obj in (notes_obj.get(tier) or [])[:6])
+        for tier in ("Top", "Middle", "Base")
+    )
+    
+    # Accords, with strength from the Main Accords Percentage object
+    main_accords = perfume.get("Main Accords") or []
+    main_accords_percentage = perfume.get("Main Accords Percentage") or {}
+    
+    accord_strengths = []
+    if main_accords_percentage:
+        # Bind the lookups once outside the loop
+        get_strength = main_accords_percentage.get
+        get_strength_value = ACCORD_STRENGTH_VALUES.get
+        
+        for accord in main_accords[:10]:  # Show top 10
+            strength = get_strength(accord, "Moderate")
+            accord_strengths.append((accord, strength, get_strength_value(strength, 50)))
+    
+    return PerfumeView(
+        name=perfume.get("Name", "Unknown Perfume"),
+        brand=perfume.get("Brand", "Unknown Brand"),
+        image_url=get_transparent_image_url(perfume.get("Image URL", "")),
+        price=perfume.get("Price", ""),
+        gender=perfume.get("Gender", "Unisex"),
+        longevity=perfume.get("Longevity", "N/A"),
+        sillage=perfume.get("Sillage", "N/A"),
+        oil_type=perfume.get("OilType", ""),
+        key_notes=", ".join((perfume.get("General Notes") or [])[:8]),
+        top_notes=top_notes,
+        middle_notes=middle_notes,
+        base_notes=base_notes,
+        accords=tuple(main_accords),
+        accord_summary=format_accords(main_accords, max_count=3),
+        accord_strengths=tuple(accord_strengths),
+        seasons_text=format_ranking(perfume.get("Season Ranking")),
+        occasions_text=format_ranking(perfume.get("Occasion Ranking"))
+    )
+
 # ============================================================================
 # PERFUME DISPLAY COMPONENTS
 # ============================================================================
 
+@functools.lru_cache(maxsize=512)
+def build_accord_bars_html(accord_strengths: Tuple[Tuple[str, str, int], ...]) -> str:
+    """
+    Build one HTML block with a colored strength bar per accord.
+    
+    Args:
+        accord_strengths (tuple): (accord, strength descriptor, bar value 0-100) entries
+    
+    Returns:
+        str: HTML (including styles) for st.markdown(..., unsafe_allow_html=True)
+    """
+    rows = []
+    
+    for accord, strength, strength_value in accord_strengths:
+        # Strength descriptors can be null/non-string in API data
+        strength_text = "" if strength is None else html.escape(str(strength))
+        
+        rows.append(
+            '<div class="accord-row">'
+            f'<div class="accord-name">{html.escape(accord.capitalize())}</div>'
+            f'<div><div class="accord-strength">{strength_text}</div>'
+            '<div class="accord-track">'
+            f'<div class="accord-bar" style="width:{strength_value}%;background:{get_accord_color(accord)}"></div>'
+            '</div></div>'
+            '</div>'
+        )
+    
+    return ACCORD_BARS_CSS + "".join(rows)
+
 def display_perfume_card(perfume: Dict[str, Any]) -> None:
     """
     Display a perfume as a card with image, name, brand, and key info.
@@ -126,32 +358,28 @@ def display_perfume_card(perfume: Dict[str, Any]) -> None:
     Args:
         perfume (dict): Perfume data from API
     """
-    # Get perfume details using correct API field names
-    name = perfume.get("Name", "Unknown Perfume")
-    brand = perfume.get("Brand", "Unknown Brand")
-    image_url = perfume.get("Image URL", "")
-    price = perfume.get("Price", "")
-    main_accords = perfume.get("Main Accords", [])
+    # Nothing to show for an empty result entry
+    if not perfume:
+        return
+    
+    # Get perfume details (resolved once per render)
+    view = build_perfume_view(perfume)
     
     # Display image
-    transparent_url = get_transparent_image_url(image_url)
-    try:
-        st.image(transparent_url, use_container_width=True)
-    except:
-        st.image("https://via.placeholder.com/300x400.png?text=No+Image", use_container_width=True)
+    # Invalid or missing URLs were already swapped for the placeholder
+    st.image(view.image_url, use_container_width=True)
     
     # Display name and brand
-    st.markdown(f"**{name}**")
-    st.caption(brand)
+    st.markdown(f"**{view.name}**")
+    st.caption(view.brand)
     
     # Display price if available
-    if price:
-        st.caption(f"💰 ${price}")
+    if view.price:
+        st.caption(format_price(view.price))
     
     # Display main accords (first 3)
-    if main_accords:
-        accord_text = format_accords(main_accords, max_count=3)
-        st.caption(f"🎨 {accord_text}")
+    if view.accords:
+        st.caption(f"🎨 {view.accord_summary}")
 
 def display_perfume_detail(perfume: Dict[str, Any]) -> None:
     """
@@ -170,41 +398,19 @@ def display_perfume_detail(perfume: Dict[str, Any]) -> None:
     Args:
         perfume (dict): Perfume data from API
     """
-    # Extract perfume details using correct API field names
-    name = perfume.get("Name", "Unknown Perfume")
-    brand = perfume.get("Brand", "Unknown Brand")
-    image_url = perfume.get("Image URL", "")
-    price = perfume.get("Price", "")
-    gender = perfume.get("Gender", "Unisex")
-    
-    # Performance attributes
-    longevity = perfume.get("Longevity", "N/A")
-    sillage = perfume.get("Sillage", "N/A")
-    oil_type = perfume.get("OilType", "")
-    
-    # Notes - API returns object with "Top", "Middle", "Base" keys
-    notes_obj = perfume.get("Notes", {})
-    top_notes = notes_obj.get("Top", [])
-    middle_notes = notes_obj.get("Middle", [])
-    base_notes = notes_obj.get("Base", [])
-    
-    # Accords
-    main_accords = perfume.get("Main Accords", [])
-    main_accords_percentage = perfume.get("Main Accords Percentage", {})
-    
-    # Rankings
-    season_ranking = perfume.get("Season Ranking", [])
-    occasion_ranking = perfume.get("Occasion Ranking", [])
-    
-    # General notes
-    general_notes = perfume.get("General Notes", [])
+    # Skip the whole layout when there is no perfume to show
+    if not perfume or not perfume.get("Name"):
+        st.info("Select a perfume to view details.")
+        return
+    
+    # Extract perfume details (resolved once per render)
+    view = build_perfume_view(perfume)
     
     # ========================================================================
     # HEADER SECTION
     # ========================================================================
     
-    st.markdown(f"# {name}")
-    st.markdown(f"### *by {brand}*")
+    st.markdown(f"# {view.name}\n### *by {view.brand}*")
     
     st.write("")
     
@@ -216,156 +422,123 @@ def display_perfume_detail(perfume: Dict[str, Any]) -> None:
     
     with col1:
         # Display image
-        transparent_url = get_transparent_image_url(image_url)
-        try:
-            st.image(transparent_url, use_container_width=True)
-        except:
-            st.image("https://via.placeholder.com/300x400.png?text=No+Image", use_container_width=True)
+        # Invalid or missing URLs were already swapped for the placeholder
+        st.image(view.image_url, use_container_width=True)
     
     with col2:
         # Key information
         st.markdown("### Overview")
         
-        if price:
-            st.markdown(f"**💰 Price:** ${price}")
+        if view.price:
+            st.markdown(format_price(view.price, detail=True))
         
-        st.markdown(f"**👤 Gender:** {gender.capitalize()}")
+        st.markdown(f"**👤 Gender:** {view.gender.capitalize()}")
         
-        if oil_type:
-            st.markdown(f"**🧪 Type:** {oil_type}")
+        if view.oil_type:
+            st.markdown(f"**🧪 Type:** {view.oil_type}")
         
-        if longevity != "N/A":
-            st.markdown(f"**⏱️ Longevity:** {longevity}")
+        if view.longevity != "N/A":
+            st.markdown(f"**⏱️ Longevity:** {view.longevity}")
         
-        if sillage != "N/A":
-            st.markdown(f"**💨 Sillage:** {sillage}")
+        if view.sillage != "N/A":
+            st.markdown(f"**💨 Sillage:** {view.sillage}")
         
         st.write("")
         
         # General notes if available
-        if general_notes:
+        if view.key_notes:
             st.markdown("### Key Notes")
-            st.write(", ".join(general_notes[:8]))
-    
-    st.write("")
-    st.markdown("---")
-    st.write("")
+            st.write(view.key_notes)
     
     # ========================================================================
     # NOTES SECTION
     # ========================================================================
     
-    st.markdown("### 🌸 Fragrance Notes")
-    st.write("")
+    # Separator and section header in one element
+    st.markdown("---\n\n### 🌸 Fragrance Notes")
     
     note_col1, note_col2, note_col3 = st.columns(3)
     
     with note_col1:
         st.markdown("**Top Notes**")
-        if top_notes:
-            for note_obj in top_notes[:6]:
-                # Each note is an object with "name" and "imageUrl"
-                note_name = note_obj.get("name", "Unknown")
-                st.caption(f"• {note_name}")
+        if view.top_notes:
+            # One caption per column
+            st.caption("  \n".join(f"• {note_name}" for note_name in view.top_notes))
         else:
             st.caption("No data")
     
     with note_col2:
         st.markdown("**Heart Notes**")
-        if middle_notes:
-            for note_obj in middle_notes[:6]:
-                note_name = note_obj.get("name", "Unknown")
-                st.caption(f"• {note_name}")
+        if view.middle_notes:
+            st.caption("  \n".join(f"• {note_name}" for note_name in view.middle_notes))
         else:
             st.caption("No data")
     
     with note_col3:
         st.markdown("**Base Notes**")
-        if base_notes:
-            for note_obj in base_notes[:6]:
-                note_name = note_obj.get("name", "Unknown")
-                st.caption(f"• {note_name}")
+        if view.base_notes:
+            st.caption("  \n".join(f"• {note_name}" for note_name in view.base_notes))
         else:
             st.caption("No data")
     
-    st.write("")
-    st.markdown("---")
-    st.write("")
-    
     # ========================================================================
     # ACCORDS SECTION
     # ========================================================================
     
-    st.markdown("### 🎨 Main Accords")
-    st.write("")
+    st.markdown("---\n\n### 🎨 Main Accords")
     
-    if main_accords and main_accords_percentage:
-        # Display accords with strength from Main Accords Percentage
-        for accord in main_accords[:10]:  # Show top 10
-            # Get strength descriptor from Main Accords Percentage object
-            strength = main_accords_percentage.get(accord, "Moderate")
-            
-            # Get color for accord
-            color = get_accord_color(accord)
-            
-            # Map strength to progress bar value (0-100)
-            strength_values = {
-                "Dominant": 100,
-                "Prominent": 80,
-                "Moderate": 60,
-                "Subtle": 40,
-                "Trace": 20
-            }
-            
-            strength_value = strength_values.get(strength, 50)
-            
-            # Display accord name and strength
-            col1, col2 = st.columns([1, 3])
-            
-            with col1:
-                st.markdown(f"**{accord.capitalize()}**")
-            
-            with col2:
-                st.progress(strength_value / 100, text=strength)
+    if view.accord_strengths:
+        # Display accords with strength from Main Accords Percentage (one element for all bars)
+        st.markdown(build_accord_bars_html(view.accord_strengths), unsafe_allow_html=True)
     else:
         st.info("No accord data available")
     
-    st.write("")
-    st.markdown("---")
-    st.write("")
-    
     # ========================================================================
     # SEASONS AND OCCASIONS
     # ========================================================================
     
+    st.markdown("---")
+    
     attr_col1, attr_col2 = st.columns(2)
     
     with attr_col1:
         st.markdown("### 🌞 Best Seasons")
-        if season_ranking:
-            # Season Ranking is array of {name, score} objects, ordered best to worst
-            for season_obj in season_ranking:
-                season_name = season_obj.get("name", "").capitalize()
-                score = season_obj.get("score", 0)
-                st.caption(f"• {season_name} ({score:.2f})")
-        else:
-            st.caption("No data")
+        # Season Ranking lines are preformatted, ordered best to worst
+        st.caption(view.seasons_text or "No data")
     
     with attr_col2:
         st.markdown("### 🎭 Best Occasions")
-        if occasion_ranking:
-            # Occasion Ranking is array of {name, score} objects, ordered best to worst
-            for occasion_obj in occasion_ranking:
-                occasion_name = occasion_obj.get("name", "").capitalize()
-                score = occasion_obj.get("score", 0)
-                st.caption(f"• {occasion_name} ({score:.2f})")
-        else:
-            st.caption("No data")
+        # Occasion Ranking lines are preformatted, ordered best to worst
+        st.caption(view.occasions_text or "No data")
 
 # ============================================================================
 # CHART CREATION FUNCTIONS
 # ============================================================================
 
+def create_empty_chart(title: str) -> go.Figure:
+    """
+    Create a placeholder chart for when there is no data to plot.
+    
+    Args:
+        title (str): Chart title
+    
+    Returns:
+        plotly.graph_objects.Figure: Empty chart with a "No data" note
+    """
+    fig = go.Figure()
+    fig.add_annotation(
+        text="No data",
+        showarrow=False,
+        font=EMPTY_CHART_FONT
+    )
+    fig.update_layout(
+        title=title,
+        showlegend=False,
+        height=300
+    )
+    return fig
+
+@st.cache_resource(hash_funcs={Counter: lambda c: tuple(c.most_common(8))})
 def create_note_donut_chart(
     notes_counter: Counter,
     title: str,
@@ -374,6 +547,9 @@ def create_note_donut_chart(
     """
     Create a donut chart for note composition.
     
+    Figures are cached by the top 8 notes, so reruns with unchanged data
+    reuse the same figure. The returned figure is shared - don't mutate it.
+    
     Args:
         notes_counter (Counter): Counter object with note counts
         title (str): Chart title
@@ -386,125 +562,87 @@ def create_note_donut_chart(
     top_notes = notes_counter.most_common(8)
     
     if not top_notes:
-        # Empty chart
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data",
-            showarrow=False,
-            font=dict(size=14, color="#999")
-        )
-        fig.update_layout(
-            title=title,
-            showlegend=False,
-            height=300
-        )
-        return fig
+        return create_empty_chart(title)
     
-    # Extract labels and values
-    labels = [note[0] for note in top_notes]
-    values = [note[1] for note in top_notes]
+    # Extract labels and values in one pass
+    labels, values = zip(*top_notes)
     
     # Create donut chart
     fig = go.Figure(data=[go.Pie(
         labels=labels,
         values=values,
         hole=0.4,
-        marker=dict(
-            colors=px.colors.sequential.RdPu,
-            line=dict(color='white', width=2)
-        ),
+        marker=dict(colors=NOTE_CHART_COLORS, line=PIE_OUTLINE),
         textposition='auto',
         textinfo='label+percent'
     )])
     
     fig.update_layout(
-        title=dict(
-            text=title,
-            font=dict(size=16, color="#d4567b", family="Arial")
-        ),
-        showlegend=False,
-        height=350,
-        margin=dict(t=50, b=20, l=20, r=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
+        title=dict(text=title, font=CHART_TITLE_FONT),
+        margin=DONUT_CHART_MARGIN,
+        **CHART_LAYOUT
     )
     
     return fig
 
+@st.cache_resource(hash_funcs={Counter: lambda c: hash(frozenset(c.items()))})
 def create_bar_chart(
     counter: Counter,
     title: str,
     xaxis_title: str,
     yaxis_title: str,
-    color: str = "#d4567b"
+    color: str = "#d4567b",
+    max_bars: int = 20
 ) -> go.Figure:
     """
     Create a bar chart for categorical data.
     
+    Only the max_bars most common categories are plotted, picked with
+    most_common(max_bars) (a heap). The cache key hashes the counter's
+    items without sorting them, so cache hits don't sort either.
+    
+    Figures are cached by the counter contents, so reruns with unchanged
+    data reuse the same figure. The returned figure is shared - don't mutate it.
+    
     Args:
         counter (Counter): Counter object with category counts
         title (str): Chart title
         xaxis_title (str): X-axis label
         yaxis_title (str): Y-axis label
         color (str): Bar color
+        max_bars (int): Maximum number of bars to show (default: 20)
     
     Returns:
         plotly.graph_objects.Figure: Bar chart
     """
     if not counter:
-        # Empty chart
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No data",
-            showarrow=False,
-            font=dict(size=14, color="#999")
-        )
-        fig.update_layout(
-            title=title,
-            showlegend=False,
-            height=300
-        )
-        return fig
+        return create_empty_chart(title)
     
-    # Sort by count (descending)
-    sorted_items = counter.most_common()
+    # Top categories by count (descending)
+    sorted_items = counter.most_common(max_bars)
     
-    # Extract categories and counts
-    categories = [item[0].capitalize() for item in sorted_items]
-    counts = [item[1] for item in sorted_items]
+    # Extract categories and counts in one pass, as arrays Plotly takes directly
+    keys, values = zip(*sorted_items)
+    categories = np.char.capitalize(np.asarray(keys, dtype=str))
+    counts = np.fromiter(values, dtype=np.int64, count=len(values))
     
     # Create bar chart
     fig = go.Figure(data=[go.Bar(
         x=categories,
         y=counts,
-        marker=dict(
-            color=color,
-            line=dict(color='white', width=1.5)
-        ),
-        text=counts,
+        marker=dict(color=color, line=BAR_OUTLINE),
+        text=values,
         textposition='auto'
     )])
     
     fig.update_layout(
-        title=dict(
-            text=title,
-            font=dict(size=16, color="#d4567b", family="Arial")
-        ),
+        title=dict(text=title, font=CHART_TITLE_FONT),
+        xaxis=CHART_GRID_AXIS,
+        yaxis=CHART_GRID_AXIS,
         xaxis_title=xaxis_title,
         yaxis_title=yaxis_title,
-        showlegend=False,
-        height=350,
-        margin=dict(t=50, b=50, l=50, r=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(
-            gridcolor='rgba(200,200,200,0.3)',
-            showgrid=True
-        ),
-        yaxis=dict(
-            gridcolor='rgba(200,200,200,0.3)',
-            showgrid=True
-        )
+        margin=BAR_CHART_MARGIN,
+        **CHART_LAYOUT
     )
     
     return fig